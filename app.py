@@ -3,19 +3,42 @@ API Stats Service - A Flask RESTful API for tracking and analyzing API usage sta
 """
 
 from flask import Flask, request
-from flask_restx import Api, Resource, fields, Namespace
+from flask.json.provider import JSONProvider
+from flask_restx import Api, Resource, Namespace
 from flask_cors import CORS
 import psycopg2
-from psycopg2.extras import RealDictCursor, Json
+from psycopg2 import pool
+from psycopg2.extras import RealDictCursor, execute_values
+from contextlib import contextmanager
 from datetime import datetime
 from dotenv import load_dotenv
+from functools import wraps
+from prometheus_client import Counter as PromCounter, Histogram, make_wsgi_app
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
+from werkzeug.middleware.proxy_fix import ProxyFix
+import atexit
+import io
+import logging
+import orjson
 import os
+import queue
+import redis
+import threading
+import time
+import urllib.parse
 
 # Load .env locally (Render ignores this and uses real env vars)
 load_dotenv()
 
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("api_stats")
+
 app = Flask(__name__)
 
+# Behind Render's proxy: trust one hop of X-Forwarded-For/-Proto so
+# request.remote_addr is the real client once, at the WSGI layer.
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1)
+
 # Allow local frontends to call the cloud API
 CORS(
     app,
@@ -31,139 +54,529 @@ api = Api(
     app,
     version="1.2",
     title="API Stats Service",
-    description="Track and analyze API usage statistics",
+    description=(
+        "Track and analyze API usage statistics. "
+        "The write endpoint POST /track/ bypasses this layer for speed "
+        "and is documented in the README."
+    ),
     doc="/docs",
 )
 
+# ==================== JSON ====================
+
+# orjson (C extension) replaces the pure-Python encoder for both plain
+# Flask responses and the flask-restx representation; it also serializes
+# datetimes natively, so no custom encoder is needed.
+
+class OrJSONProvider(JSONProvider):
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+app.json = OrJSONProvider(app)
+
+@api.representation('application/json')
+def output_json(data, code, headers=None):
+    resp = app.make_response((orjson.dumps(data), code))
+    resp.mimetype = 'application/json'
+    resp.headers.extend(headers or {})
+    return resp
+
 DATABASE_URL = os.environ.get("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set")
 
+# When Postgres is co-located, talk over its UNIX socket instead of TCP
+# loopback: same queries, less per-packet kernel work on every round-trip.
+PG_SOCKET_DIR = "/var/run/postgresql"
+if "@localhost" in DATABASE_URL and os.path.exists(PG_SOCKET_DIR):
+    DATABASE_URL = DATABASE_URL.replace(
+        "@localhost", "@" + urllib.parse.quote(PG_SOCKET_DIR, safe=""), 1
+    )
+
 # ==================== Database ====================
 
+class PreparingConnection(psycopg2.extensions.connection):
+    """Connection that remembers whether its server-side statements are PREPAREd."""
+    prepared = False
+
+# One pool per process: connecting to Postgres (TCP + TLS + auth) on every
+# request costs far more than the queries themselves.
+# No default cursor_factory: the write path never reads rows, so dict
+# rows would be allocated for nothing; readers opt into RealDictCursor.
+# Runaway stats reads fail fast instead of pinning a pooled connection.
+# Applied per read transaction (SET LOCAL), not session-wide: the flush
+# worker's COPY/UNNEST batches are biggest exactly during spikes and must
+# not be cancelled mid-flush.
+STATS_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 2000))
+
+DB_POOL = pool.ThreadedConnectionPool(
+    int(os.environ.get("DB_POOL_MIN", 2)),
+    int(os.environ.get("DB_POOL_MAX", 20)),
+    DATABASE_URL,
+    connection_factory=PreparingConnection,
+    # Shows up as 'api-stats' in pg_stat_activity
+    options="-c application_name=api-stats",
+)
+atexit.register(DB_POOL.closeall)
+
+@contextmanager
 def get_db_connection():
-    return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+    conn = DB_POOL.getconn()
+    try:
+        yield conn
+    except Exception:
+        # Don't return a connection in an unknown state to the pool
+        DB_POOL.putconn(conn, close=True)
+        raise
+    else:
+        DB_POOL.putconn(conn)
+
+# ==================== Observability ====================
+
+DB_LATENCY = Histogram(
+    'db_query_seconds', 'Time spent talking to Postgres', ['op'],
+    buckets=(.001, .005, .01, .05, .1, .5, 1)
+)
+DB_ERRORS = PromCounter('db_error_total', 'Failed Postgres operations', ['op'])
+CACHE_REQUESTS = PromCounter('stats_cache_total', 'Stats cache lookups', ['result'])
+DROPPED_LOGS = PromCounter('log_queue_dropped_total', 'Log rows dropped (queue full or row rejected by the database)')
+
+def _metrics_app():
+    # With several gunicorn workers each scrape lands on one of them, so
+    # the default per-process registry yields inconsistent samples. When
+    # PROMETHEUS_MULTIPROC_DIR is set, prometheus_client mmaps metrics
+    # there and we serve the aggregate across workers instead.
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import CollectorRegistry, multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return make_wsgi_app(registry)
+    return make_wsgi_app()
+
+# /metrics is served by prometheus_client directly, outside the Flask app
+app.wsgi_app = DispatcherMiddleware(app.wsgi_app, {"/metrics": _metrics_app()})
+
+# ==================== Cache ====================
+
+# Optional Redis response cache for /stats/*; enabled when REDIS_URL is set.
+REDIS_URL = os.environ.get("REDIS_URL")
+redis_client = redis.Redis.from_url(REDIS_URL) if REDIS_URL else None
+
+# Tiny in-process layer in front of Redis (and the only layer when Redis
+# is off): a hit costs a dict lookup, and the flush worker clears it, so
+# within one process the stats lag writes by at most one flush.
+_local_cache = {}
+_local_cache_lock = threading.Lock()
+
+def _local_cache_get(key):
+    entry = _local_cache.get(key)
+    if entry and time.monotonic() < entry[1]:
+        return entry[0]
+    return None
+
+def _local_cache_set(key, value, ttl):
+    with _local_cache_lock:
+        _local_cache[key] = (value, time.monotonic() + ttl)
+
+def invalidate_stats_cache():
+    with _local_cache_lock:
+        _local_cache.clear()
+
+def cached(key, ttl):
+    """Cache a JSON-safe response dict in Redis for `ttl` seconds.
+
+    A second copy is kept without expiry so that if Postgres goes down we
+    can keep serving the last known value past its TTL.
+    """
+    stale_key = key + ":stale"
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            hit = _local_cache_get(key)
+            if hit is not None:
+                CACHE_REQUESTS.labels(result='hit').inc()
+                return hit
+            if redis_client is not None:
+                try:
+                    raw = redis_client.get(key)
+                    if raw is not None:
+                        CACHE_REQUESTS.labels(result='hit').inc()
+                        hit = orjson.loads(raw)
+                        _local_cache_set(key, hit, ttl)
+                        return hit
+                except redis.RedisError as e:
+                    logger.warning("Redis error, bypassing cache: %s", e)
+            CACHE_REQUESTS.labels(result='miss').inc()
+            try:
+                result = fn(*args, **kwargs)
+            except (psycopg2.OperationalError, pool.PoolError) as e:
+                # PoolError: an exhausted pool means "DB unavailable" to
+                # this request just as much as a refused connection does
+                if redis_client is not None:
+                    logger.error("DB unavailable, trying stale cache: %s", e)
+                    try:
+                        stale = redis_client.get(stale_key)
+                    except redis.RedisError as redis_err:
+                        logger.warning("Redis error on stale read: %s", redis_err)
+                        stale = None
+                    if stale is not None:
+                        CACHE_REQUESTS.labels(result='stale').inc()
+                        return orjson.loads(stale)
+                raise
+            if isinstance(result, dict):
+                _local_cache_set(key, result, ttl)
+                if redis_client is not None:
+                    body = orjson.dumps(result)
+                    try:
+                        redis_client.set(key, body, ex=ttl)
+                        redis_client.set(stale_key, body)
+                    except redis.RedisError as e:
+                        logger.warning("Redis error, response not cached: %s", e)
+            return result
+        return wrapper
+    return decorator
 
 # ==================== Namespaces ====================
 
-ns_track = Namespace('track', description='Track API calls')
 ns_stats = Namespace('stats', description='API usage statistics')
 ns_health = Namespace('health', description='Health check')
 
-api.add_namespace(ns_track, path='/track')
 api.add_namespace(ns_stats, path='/stats')
 api.add_namespace(ns_health, path='/health')
 
-# ==================== Models ====================
+# ==================== Helpers ====================
 
-track_request_model = api.model('TrackRequest', {
-    'id': fields.Integer(required=True, description="External user/service ID"),
-    'calledService': fields.String(required=True, description="Endpoint that was called")
-})
+# Writes are buffered here and flushed in batches by a background thread,
+# so request handlers never wait on an INSERT + commit. The flush interval
+# bounds how stale /stats/* can be relative to accepted writes.
+LOG_BATCH_SIZE = int(os.environ.get("LOG_BATCH_SIZE", 100))
+LOG_FLUSH_INTERVAL = int(os.environ.get("LOG_FLUSH_INTERVAL_MS", 50)) / 1000.0
 
-# ==================== Helpers ====================
+_LOG_QUEUE = queue.Queue(maxsize=10000)
+
+# called_at is stamped by Postgres (DEFAULT now()): no timestamp parameter
+# on the wire, no clock call per enqueue. Rows in one flush share a stamp,
+# at most LOG_FLUSH_INTERVAL behind the actual request.
+INSERT_CALL_SQL = """
+    INSERT INTO api_calls (external_user_id, endpoint, method, ip_address, request_body, status_code)
+    VALUES %s
+"""
+
+# Above this size, ship the batch as six arrays expanded server-side:
+# one Parse/Bind and six parameters total, instead of six placeholders
+# per row in a growing VALUES list.
+UNNEST_MIN_ROWS = 50
+
+UNNEST_INSERT_SQL = """
+    INSERT INTO api_calls (external_user_id, endpoint, method, ip_address, request_body, status_code)
+    SELECT * FROM UNNEST (%s::int[], %s::text[], %s::text[], %s::text[], %s::jsonb[], %s::int[])
+"""
+
+# Bursts that outran the flusher are drained in one go (up to
+# BURST_BATCH_SIZE) and, past COPY_MIN_ROWS, shipped over the COPY
+# protocol — Postgres's fastest ingest path.
+COPY_MIN_ROWS = 500
+BURST_BATCH_SIZE = 5000
+
+COPY_CALLS_SQL = """
+    COPY api_calls (external_user_id, endpoint, method, ip_address, request_body, status_code)
+    FROM STDIN
+"""
+
+def _copy_escape(value):
+    if value is None:
+        return r"\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+def _copy_batch(cur, batch):
+    buf = io.StringIO()
+    for row in batch:
+        buf.write("\t".join(_copy_escape(v) for v in row))
+        buf.write("\n")
+    buf.seek(0)
+    cur.copy_expert(COPY_CALLS_SQL, buf)
+
+# PREPARE is per-session; the pool's long-lived connections pay the
+# parse/plan cost once per statement instead of on every use.
+PREPARE_STATEMENTS_SQL = """
+    PREPARE upsert_endpoint_count (text, bigint, int, text, text) AS
+    INSERT INTO endpoint_counts (endpoint, cnt, last_called, last_user_id, last_method, last_ip)
+    VALUES ($1, $2, now(), $3, $4, $5)
+    ON CONFLICT (endpoint) DO UPDATE
+    SET cnt = endpoint_counts.cnt + EXCLUDED.cnt,
+        last_called = EXCLUDED.last_called,
+        last_user_id = EXCLUDED.last_user_id,
+        last_method = EXCLUDED.last_method,
+        last_ip = EXCLUDED.last_ip;
+
+    PREPARE stats_last AS
+    SELECT last_user_id AS external_user_id, endpoint, last_method AS method,
+           last_ip AS ip_address, last_called AS called_at
+    FROM endpoint_counts
+    ORDER BY last_called DESC
+    LIMIT 1;
+
+    PREPARE stats_most AS
+    SELECT endpoint, cnt AS total_calls
+    FROM endpoint_counts
+    ORDER BY cnt DESC
+    LIMIT 1;
+
+    PREPARE stats_counts AS
+    SELECT endpoint, cnt AS total_calls
+    FROM endpoint_counts
+    ORDER BY cnt DESC
+"""
+
+def ensure_prepared(conn):
+    if conn.prepared:
+        return
+    with conn.cursor() as cur:
+        cur.execute(PREPARE_STATEMENTS_SQL)
+    conn.prepared = True
+
+def _rollup_batch(batch):
+    # One row per distinct endpoint: its count in this batch plus the
+    # caller fields of its latest occurrence (batches arrive in request
+    # order); last_called comes from now() on the server
+    rollup = {}
+    for user_id, endpoint, method, ip, _body, _status in batch:
+        cnt = rollup[endpoint][1] if endpoint in rollup else 0
+        rollup[endpoint] = (endpoint, cnt + 1, user_id, method, ip)
+    return list(rollup.values())
+
+def _insert_batch(batch):
+    with DB_LATENCY.labels(op='flush').time():
+        with get_db_connection() as conn:
+            ensure_prepared(conn)
+            with conn.cursor() as cur:
+                if len(batch) >= COPY_MIN_ROWS:
+                    _copy_batch(cur, batch)
+                elif len(batch) >= UNNEST_MIN_ROWS:
+                    cur.execute(UNNEST_INSERT_SQL, [list(col) for col in zip(*batch)])
+                else:
+                    # Explicit cast: the body is JSON text, never a dict
+                    # left to implicit adaptation
+                    execute_values(cur, INSERT_CALL_SQL, batch,
+                                   template="(%s, %s, %s, %s, %s::jsonb, %s)",
+                                   page_size=LOG_BATCH_SIZE)
+                cur.executemany("EXECUTE upsert_endpoint_count (%s, %s, %s, %s, %s)", _rollup_batch(batch))
+            conn.commit()
+    invalidate_stats_cache()
+
+def _flush_batch(batch):
+    """Flush with failure isolation.
+
+    One whole-batch retry covers transient errors (restart, failover);
+    after that, rows are inserted one by one so a poison row — e.g. a body
+    jsonb rejects — loses only itself, not the rest of the batch.
+    """
+    for attempt in (1, 2):
+        try:
+            _insert_batch(batch)
+            return
+        except Exception as e:
+            DB_ERRORS.labels(op='flush').inc()
+            logger.error("Error flushing log batch of %d (attempt %d): %s",
+                         len(batch), attempt, e)
+    for row in batch:
+        try:
+            _insert_batch([row])
+        except Exception as e:
+            DB_ERRORS.labels(op='flush_row').inc()
+            DROPPED_LOGS.inc()
+            logger.error("Dropping unloggable row for %s: %s", row[1], e)
+
+def _drain_log_queue():
+    while True:
+        batch = [_LOG_QUEUE.get()]
+        deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+        while len(batch) < LOG_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_LOG_QUEUE.get(timeout=remaining))
+            except queue.Empty:
+                break
+        # If a burst piled up while we waited, take all of it in one flush
+        while len(batch) < BURST_BATCH_SIZE:
+            try:
+                batch.append(_LOG_QUEUE.get_nowait())
+            except queue.Empty:
+                break
+        _flush_batch(batch)
+
+threading.Thread(target=_drain_log_queue, daemon=True).start()
+
+def _flush_log_queue():
+    # atexit: write out whatever the worker has not picked up yet
+    batch = []
+    while True:
+        try:
+            batch.append(_LOG_QUEUE.get_nowait())
+        except queue.Empty:
+            break
+    if batch:
+        _flush_batch(batch)
+
+atexit.register(_flush_log_queue)
 
 def log_call(external_user_id, endpoint, method, ip, request_body=None, status_code=200):
-    conn = get_db_connection()
     try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO api_calls (external_user_id, endpoint, method, ip_address, request_body, status_code, called_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (
-                external_user_id,
-                endpoint,
-                method,
-                ip,
-                Json(request_body) if request_body else None,
-                status_code,
-                datetime.now()
-            ))
-            conn.commit()
+        _LOG_QUEUE.put_nowait((
+            external_user_id,
+            endpoint,
+            method,
+            ip,
+            # Pre-serialized: both insert paths take jsonb from text, and a
+            # plain string is safe to hold outside the request context
+            request_body if isinstance(request_body, str)
+            else orjson.dumps(request_body).decode() if request_body else None,
+            status_code
+        ))
         return True
-    except Exception as e:
-        print("Error logging call:", e)
-        conn.rollback()
+    except queue.Full:
+        DROPPED_LOGS.inc()
+        logger.warning("Log queue full, dropping call for %s", endpoint)
         return False
-    finally:
-        conn.close()
+
+# ==================== Request logging ====================
+
+# Paths we never log: stats/health/doc traffic would drown out the real
+# calls, and /track is skipped because its handler calls log_call itself
+# (with the caller-supplied user id) — logging it here too would double
+# every tracked call.
+EXCLUDED_PATH_PREFIXES = ('/track', '/stats', '/health', '/docs', '/swagger')
+
+def serialized_body():
+    """The request body as a JSON string, or None if there isn't valid JSON.
+
+    The parse (cached by Werkzeug, so handlers share it) only validates;
+    the logged value is the raw bytes the client sent, skipping a
+    re-serialization of the parsed dict.
+    """
+    if request.get_json(silent=True, cache=True) is None:
+        return None
+    return request.get_data(as_text=True)
+
+def client_ip():
+    # ProxyFix has already resolved X-Forwarded-For into remote_addr
+    return request.remote_addr or ""
+
+# after_request, not before_request: the handler runs first, so logging
+# never delays it and the real status code is known.
+@app.after_request
+def log_every_request(response):
+    if request.path.startswith(EXCLUDED_PATH_PREFIXES):
+        return response
+    log_call(
+        external_user_id=None,
+        endpoint=request.path,
+        method=request.method,
+        ip=client_ip(),
+        request_body=serialized_body(),
+        status_code=response.status_code
+    )
+    return response
 
 # ==================== Queries ====================
 
 def get_last_called():
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT external_user_id, endpoint, method, ip_address, called_at
-                FROM api_calls
-                ORDER BY called_at DESC
-                LIMIT 1
-            """)
+    with DB_LATENCY.labels(op='stats_last').time(), get_db_connection() as conn:
+        ensure_prepared(conn)
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SET LOCAL statement_timeout = %s", (STATS_STATEMENT_TIMEOUT_MS,))
+            cur.execute("EXECUTE stats_last")
             return cur.fetchone()
-    finally:
-        conn.close()
 
 def get_most_frequent():
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT endpoint, COUNT(*) AS total_calls
-                FROM api_calls
-                GROUP BY endpoint
-                ORDER BY total_calls DESC
-                LIMIT 1
-            """)
+    with DB_LATENCY.labels(op='stats_most').time(), get_db_connection() as conn:
+        ensure_prepared(conn)
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SET LOCAL statement_timeout = %s", (STATS_STATEMENT_TIMEOUT_MS,))
+            cur.execute("EXECUTE stats_most")
             return cur.fetchone()
-    finally:
-        conn.close()
 
 def get_counts():
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT endpoint, COUNT(*) AS total_calls
-                FROM api_calls
-                GROUP BY endpoint
-                ORDER BY total_calls DESC
-            """)
+    with DB_LATENCY.labels(op='stats_counts').time(), get_db_connection() as conn:
+        ensure_prepared(conn)
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SET LOCAL statement_timeout = %s", (STATS_STATEMENT_TIMEOUT_MS,))
+            cur.execute("EXECUTE stats_counts")
             return cur.fetchall()
-    finally:
-        conn.close()
 
-# ==================== Endpoints ====================
+# Liveness probes hit /health every few seconds; cache the DB probe so
+# they don't turn into a connection storm.
+HEALTH_CACHE_TTL = 3  # seconds
+
+_HEALTH = {"ok": True, "time": None, "ts": 0.0}
 
-@ns_track.route('/')
-class Track(Resource):
-    @ns_track.expect(track_request_model, validate=True)
-    def post(self):
-        data = request.json
-        raw_ip = request.headers.get('X-Forwarded-For', request.remote_addr)
-        ip = raw_ip.split(',')[0].strip()
+def check_database_health():
+    now = time.monotonic()
+    if now - _HEALTH["ts"] < HEALTH_CACHE_TTL:
+        return _HEALTH["ok"]
+    ok = False
+    try:
+        with DB_LATENCY.labels(op='health').time(), get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+                cur.fetchone()
+        ok = True
+    except Exception as e:
+        DB_ERRORS.labels(op='health').inc()
+        logger.error("Health check failed: %s", e)
+    _HEALTH["ok"] = ok
+    _HEALTH["time"] = datetime.now().isoformat()
+    _HEALTH["ts"] = now
+    return ok
 
-        success = log_call(
-            external_user_id=data['id'],
-            endpoint=data['calledService'],
-            method="POST",
-            ip=ip,
-            request_body=data
-        )
+# ==================== Endpoints ====================
 
-        if success:
-            return {
-                "message": "Logged successfully",
-                "endpoint": data['calledService']
-            }, 201
+# /track is the highest-QPS endpoint; it runs as a plain Flask view so a
+# call doesn't pay for Resource dispatch and Swagger bookkeeping it never
+# uses. The docs for it live in the README.
+@app.post('/track/')
+def track():
+    # Checked by hand: jsonschema validation of this two-field body
+    # costs more than the rest of the handler put together.
+    data = request.get_json(silent=True, cache=True) or {}
+    external_user_id = data.get('id')
+    called_service = data.get('calledService')
+    if (not isinstance(external_user_id, int) or isinstance(external_user_id, bool)
+            or not isinstance(called_service, str) or not called_service):
+        return {"error": "Body must contain an integer 'id' and a non-empty 'calledService'"}, 400
+
+    success = log_call(
+        external_user_id=external_user_id,
+        endpoint=called_service,
+        method="POST",
+        ip=client_ip(),
+        request_body=serialized_body()
+    )
+
+    if success:
+        # 202: the row is queued for the background flush, not committed yet
+        return {
+            "message": "Accepted",
+            "endpoint": called_service
+        }, 202
 
-        return {"error": "Logging failed"}, 500
+    return {"error": "Logging failed"}, 500
 
 
 @ns_stats.route('/last')
 class Last(Resource):
+    @cached("stats:last", ttl=2)
     def get(self):
-        row = get_last_called()
+        try:
+            row = get_last_called()
+        except psycopg2.errors.QueryCanceled:
+            return {"error": "Stats query timed out"}, 503
         if not row:
             return {"message": "No data yet"}, 200
 
@@ -180,8 +593,12 @@ class Last(Resource):
 
 @ns_stats.route('/most')
 class Most(Resource):
+    @cached("stats:most", ttl=30)
     def get(self):
-        row = get_most_frequent()
+        try:
+            row = get_most_frequent()
+        except psycopg2.errors.QueryCanceled:
+            return {"error": "Stats query timed out"}, 503
         if not row:
             return {"message": "No data yet"}, 200
 
@@ -195,8 +612,12 @@ class Most(Resource):
 
 @ns_stats.route('/counts')
 class Counts(Resource):
+    @cached("stats:counts", ttl=30)
     def get(self):
-        rows = get_counts()
+        try:
+            rows = get_counts()
+        except psycopg2.errors.QueryCanceled:
+            return {"error": "Stats query timed out"}, 503
         return {
             "counts": [
                 {"endpoint": r["endpoint"], "total_calls": r["total_calls"]}
@@ -208,11 +629,19 @@ class Counts(Resource):
 @ns_health.route('/')
 class Health(Resource):
     def get(self):
-        return {"status": "ok", "time": datetime.now()}
+        ok = check_database_health()
+        payload = {
+            "status": "ok" if ok else "degraded",
+            "database": ok,
+            "time": _HEALTH["time"]
+        }
+        return payload, 200 if ok else 503
 
 
 # ==================== Run ====================
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
-    app.run(host="0.0.0.0", port=port)
+    # Threaded so concurrent requests overlap their DB round-trips instead
+    # of queueing behind a single worker; pairs with the connection pool.
+    app.run(host="0.0.0.0", port=port, threaded=True)
@@ -12,15 +12,60 @@ GRANT ALL PRIVILEGES ON DATABASE api_service_db TO api_user;
 
 DROP TABLE IF EXISTS api_calls;
 
+-- Partitioned by month so hot queries and index writes only touch the
+-- newest partition, and old months can be detached/dropped cheaply.
+-- The app is unaware of this: it reads and writes the parent table.
 CREATE TABLE api_calls (
-    id SERIAL PRIMARY KEY,
+    id BIGSERIAL,
     external_user_id INTEGER,
     endpoint TEXT NOT NULL,
     method TEXT NOT NULL,
     ip_address TEXT,
     request_body JSONB,
     status_code INTEGER,
-    called_at TIMESTAMP NOT NULL DEFAULT NOW()
+    called_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, called_at)
+) PARTITION BY RANGE (called_at);
+
+-- Pre-create the current and next month; a monthly cron (or pg_partman)
+-- should keep creating the next one. The DEFAULT partition catches rows
+-- if partition creation ever falls behind.
+CREATE TABLE api_calls_2026_08 PARTITION OF api_calls
+    FOR VALUES FROM ('2026-08-01') TO ('2026-09-01');
+CREATE TABLE api_calls_2026_09 PARTITION OF api_calls
+    FOR VALUES FROM ('2026-09-01') TO ('2026-10-01');
+CREATE TABLE api_calls_default PARTITION OF api_calls DEFAULT;
+
+-- Retention: the raw log is only needed for ad-hoc analysis (stats are
+-- served from endpoint_counts), so the same monthly job that creates
+-- the next partition should drop ones past the retention window —
+-- a metadata-only operation, no bulk DELETE, no vacuum debt:
+--   ALTER TABLE api_calls DETACH PARTITION api_calls_2026_08;
+--   DROP TABLE api_calls_2026_08;
+
+-- /stats/* is served from endpoint_counts, so api_calls indexes exist
+-- only for ad-hoc analysis. BRIN suits the append-only called_at column:
+-- a few pages total and near-zero insert cost, unlike the btree it
+-- replaces. Keep the index count low here — every extra index taxes the
+-- hot write path.
+-- Live-table builds: CREATE INDEX CONCURRENTLY does not work on a
+-- partitioned parent. Instead, CREATE INDEX ... ON ONLY api_calls, build
+-- the matching index on each partition with CONCURRENTLY, then
+-- ALTER INDEX ... ATTACH PARTITION each one to validate the parent.
+CREATE INDEX api_calls_called_at_brin ON api_calls USING BRIN (called_at);
+CREATE INDEX api_calls_endpoint ON api_calls (endpoint);
+
+-- Per-endpoint rollup kept in sync by the app on every insert batch,
+-- so /stats/* never has to scan api_calls.
+DROP TABLE IF EXISTS endpoint_counts;
+
+CREATE TABLE endpoint_counts (
+    endpoint TEXT PRIMARY KEY,
+    cnt BIGINT NOT NULL DEFAULT 0,
+    last_called TIMESTAMPTZ,
+    last_user_id INTEGER,
+    last_method TEXT,
+    last_ip TEXT
 );
 
 -- Optional: check table structure
@@ -0,0 +1,33 @@
+import multiprocessing
+import os
+
+# gevent workers by default: every request spends most of its time
+# waiting on Postgres, so greenlets multiplex far more concurrency per
+# worker than sync workers ever could. gthread is the fallback when
+# monkey patching gets in the way (profiling, debuggers): psycopg2
+# releases the GIL inside libpq, so threads still overlap DB waits.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gevent")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_connections = 1000
+threads = int(os.environ.get("GUNICORN_THREADS", 16))  # gthread only
+bind = "0.0.0.0:" + os.environ.get("PORT", "5000")
+
+# Keep DB_POOL_MAX in the same ballpark as per-worker concurrency
+# (worker_connections for gevent, threads for gthread), or requests will
+# queue on the pool instead of the database.
+
+
+def child_exit(server, worker):
+    # Clean up a dead worker's mmap files so its gauges don't linger in
+    # the aggregated /metrics output
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    if worker_class == "gevent":
+        # Make psycopg2 yield to the gevent loop during DB waits; without
+        # this every query blocks the whole worker.
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()